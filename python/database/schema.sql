@@ -11,3 +11,18 @@ CREATE TABLE IF NOT EXISTS licences (
     INDEX idx_product (product),
     INDEX idx_status (status)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS verification_logs (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    license_key VARCHAR(255) NOT NULL,
+    product VARCHAR(255) NOT NULL,
+    domain VARCHAR(255) DEFAULT NULL,
+    owner_name VARCHAR(255) DEFAULT NULL,
+    panel_version VARCHAR(50) DEFAULT NULL,
+    server_ip VARCHAR(45) DEFAULT NULL,
+    controller_hash VARCHAR(64) DEFAULT NULL,
+    ip_address VARCHAR(45) DEFAULT NULL,
+    request_status VARCHAR(20) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_license_key (license_key)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -12,6 +12,8 @@ from typing import List
 from datetime import datetime
 import sys
 
+from product_catalog import ProductCatalog, locked_update_json
+
 
 class Colors:
     BLUE = '\033[34;1m'
@@ -27,6 +29,7 @@ class Colors:
 
 
 def load_config(config_file: str = 'config.json') -> dict:
+    global CONFIG_PATH
     candidates = []
     candidates.append(os.path.abspath(config_file))
     candidates.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', config_file)))
@@ -40,7 +43,9 @@ def load_config(config_file: str = 'config.json') -> dict:
         tried.append(path)
         try:
             with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                config = json.load(f)
+            CONFIG_PATH = path
+            return config
         except FileNotFoundError:
             continue
         except json.JSONDecodeError:
@@ -55,10 +60,12 @@ def load_config(config_file: str = 'config.json') -> dict:
     sys.exit(1)
 
 
+CONFIG_PATH = None
 CONFIG = load_config()
 DB_CONFIG = CONFIG['database']
 TABLE_NAME = CONFIG['table']['name']
 PRODUCT_NAME = CONFIG.get('product', {}).get('name', '')
+PRODUCTS_TABLE = CONFIG['table'].get('products_table', '')
 KEY_LENGTH = CONFIG['license']['key_length']
 
 
@@ -150,6 +157,36 @@ class LicenseDatabase:
             print(f"{Colors.RED}Error creating table: {e}{Colors.RESET}")
             return False
 
+    def create_products_table(self) -> bool:
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {PRODUCTS_TABLE} (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    name VARCHAR(255) UNIQUE NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+            """)
+            self.connection.commit()
+            cursor.close()
+            return True
+        except Error as e:
+            print(f"{Colors.RED}Error creating products table: {e}{Colors.RESET}")
+            return False
+
+    def sync_products(self, products: List[str]) -> int:
+        try:
+            cursor = self.connection.cursor()
+            query = f"INSERT IGNORE INTO {PRODUCTS_TABLE} (name) VALUES (%s)"
+            cursor.executemany(query, [(p,) for p in products])
+            self.connection.commit()
+            affected = cursor.rowcount
+            cursor.close()
+            return max(affected, 0)
+        except Error as e:
+            print(f"{Colors.RED}Error syncing products table: {e}{Colors.RESET}")
+            return 0
+
     def delete_license(self, license_key: str) -> bool:
         try:
             cursor = self.connection.cursor()
@@ -287,6 +324,7 @@ class LicenseKeyCLI:
         self.terminal_width = self.get_terminal_width()
         self.ascii_banner = self.load_ascii_banner()
         self.products_file = os.path.join(os.path.dirname(__file__), 'products.json')
+        self.catalog = ProductCatalog(self.products_file)
 
     def get_terminal_width(self) -> int:
         try:
@@ -332,6 +370,7 @@ class LicenseKeyCLI:
             f"{Colors.CYAN}[5]{Colors.RESET} Clear verification_logs table",
             f"{Colors.CYAN}[6]{Colors.RESET} Database Information",
             f"{Colors.CYAN}[7]{Colors.RESET} Exit",
+            f"{Colors.CYAN}[8]{Colors.RESET} Import / Reconcile Licenses",
             ""
         ]
 
@@ -460,6 +499,52 @@ class LicenseKeyCLI:
         print(f"{self.center_text(f'{Colors.CYAN}{filename}{Colors.RESET}')}\n")
         input(f"{self.center_text(f'{Colors.DIM}Press Enter to continue...{Colors.RESET}')}")
 
+    def import_licenses(self):
+        from license_importer import LicenseImporter, detect_format
+
+        self.clear_screen()
+        self.display_header()
+        print(f"\n{self.center_text(f'{Colors.YELLOW}Import / Reconcile Licenses{Colors.RESET}')}\n")
+        print(self.center_text("Path to CSV, NDJSON or SQL dump: "), end='')
+        path = input().strip()
+        if not path or not os.path.isfile(path):
+            print(f"\n{self.center_text(f'{Colors.RED}File not found!{Colors.RESET}')}")
+            input(f"\n{self.center_text(f'{Colors.DIM}Press Enter to continue...{Colors.RESET}')}")
+            return
+
+        fmt = detect_format(path)
+        if fmt is None:
+            print(self.center_text("Format (csv, ndjson, sql): "), end='')
+            fmt = input().strip().lower()
+
+        print(self.center_text("Insert new keys into the licences table? (n = reconcile only) (y/n): "), end='')
+        apply = input().strip().lower().startswith('y')
+
+        products = self.catalog.names()
+        if self.catalog.products() is None and PRODUCT_NAME:
+            products = {PRODUCT_NAME}
+
+        print(f"\n{self.center_text(f'{Colors.YELLOW}Importing {path}...{Colors.RESET}')}\n")
+        report = LicenseImporter(DB_CONFIG, products).run_import(path, fmt, apply)
+        if report is None:
+            print(f"{self.center_text(f'{Colors.RED}✗ Import failed{Colors.RESET}')}")
+            input(f"\n{self.center_text(f'{Colors.DIM}Press Enter to continue...{Colors.RESET}')}")
+            return
+
+        added_label = 'Added' if report['applied'] else 'New (not inserted)'
+        print(self.center_text("─" * 50))
+        print(self.center_text(f"Accepted: {Colors.CYAN}{report['accepted']}{Colors.RESET}"))
+        print(self.center_text(f"Rejected: {Colors.RED}{report['rejected']}{Colors.RESET}"))
+        print(self.center_text(f"Duplicates in file: {Colors.YELLOW}{report['duplicates']}{Colors.RESET}"))
+        print(self.center_text(f"{added_label}: {Colors.GREEN}{report['added']}{Colors.RESET}"))
+        print(self.center_text(f"Already present: {Colors.CYAN}{report['present']}{Colors.RESET}"))
+        print(self.center_text(f"Conflicting: {Colors.RED}{report['conflict']}{Colors.RESET}"))
+        print(self.center_text(f"Conflicting within file: {Colors.RED}{report['file_conflict']}{Colors.RESET}"))
+        print(self.center_text("─" * 50))
+        print(self.center_text(f"Diff: {Colors.CYAN}{report['diff_file']}{Colors.RESET}"))
+        print(self.center_text(f"Rejects: {Colors.CYAN}{report['rejects_file']}{Colors.RESET}"))
+        input(f"\n{self.center_text(f'{Colors.DIM}Press Enter to continue...{Colors.RESET}')}")
+
     def show_database_info(self):
         self.clear_screen()
         self.display_header()
@@ -474,7 +559,7 @@ class LicenseKeyCLI:
         input(f"\n{self.center_text(f'{Colors.DIM}Press Enter to continue...{Colors.RESET}')}")
 
     def add_test_product(self):
-        global PRODUCT_NAME, CONFIG
+        global PRODUCT_NAME
         self.clear_screen()
         self.display_header()
         print(self.center_text(f"{Colors.YELLOW}Add Test Product{Colors.RESET}\n"))
@@ -490,10 +575,10 @@ class LicenseKeyCLI:
         except Exception as e:
             print(self.center_text(f"{Colors.RED}Failed to add to products.json: {e}{Colors.RESET}"))
 
-        CONFIG['product']['name'] = pname
         try:
-            with open('config.json', 'w', encoding='utf-8') as f:
-                json.dump(CONFIG, f, indent=4)
+            # Re-read under the lock so changes made by other processes are kept
+            locked_update_json(CONFIG_PATH, lambda data: data.setdefault('product', {}).update(name=pname))
+            CONFIG.setdefault('product', {})['name'] = pname
             PRODUCT_NAME = pname
             print(self.center_text(f"{Colors.GREEN}Product set to: {pname}{Colors.RESET}"))
         except Exception as e:
@@ -566,33 +651,14 @@ class LicenseKeyCLI:
         input(self.center_text(f"\n{Colors.DIM}Press Enter to continue...{Colors.RESET}"))
 
     def load_products(self) -> List[str]:
-        try:
-            if not os.path.exists(self.products_file):
-                return None
-
-            with open(self.products_file, 'r', encoding='utf-8') as f:
-                try:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        return data
-                    else:
-                        return []
-                except json.JSONDecodeError:
-                    return []
-        except Exception:
-            return []
+        return self.catalog.products()
 
     def save_products(self, products: List[str]):
-        with open(self.products_file, 'w', encoding='utf-8') as f:
-            json.dump(products, f, indent=4)
+        self.catalog.save(products)
 
     def add_product_to_file(self, product_name: str):
-        products = self.load_products()
-        if products is None:
-            products = []
-        if product_name not in products:
-            products.append(product_name)
-            self.save_products(products)
+        if self.catalog.add(product_name) and PRODUCTS_TABLE and self.db.connection:
+            self.db.sync_products([product_name])
 
     def clear_verification_logs_flow(self):
         self.clear_screen()
@@ -652,6 +718,8 @@ class LicenseKeyCLI:
             return
 
         self.db.create_table_if_not_exists()
+        if PRODUCTS_TABLE and self.db.create_products_table():
+            self.catalog.sync_to_database(self.db)
         print(f"{Colors.GREEN}Database ready!{Colors.RESET}")
         input(f"\n{Colors.DIM}Press Enter to continue...{Colors.RESET}")
 
@@ -677,6 +745,8 @@ class LicenseKeyCLI:
                 print(f"\n{self.center_text(f'{Colors.GREEN}Thank you for using Safety Blur License Generator!{Colors.RESET}')}\n")
                 self.db.disconnect()
                 break
+            elif choice == '8':
+                self.import_licenses()
             else:
                 print(f"\n{self.center_text(f'{Colors.RED}Invalid choice! Please try again.{Colors.RESET}')}")
                 input(f"\n{self.center_text(f'{Colors.DIM}Press Enter to continue...{Colors.RESET}')}")
@@ -0,0 +1,535 @@
+import csv
+import itertools
+import json
+import os
+import re
+import tempfile
+from datetime import datetime
+from typing import Iterator, List, Optional, Set, Tuple
+
+from mysql.connector import Error
+
+from license_generator import (
+    CONFIG,
+    Colors,
+    KEY_LENGTH,
+    LicenseDatabase,
+    TABLE_NAME,
+)
+
+
+STAGING_TABLE = f"{TABLE_NAME}_import_staging"
+STAGING_KEYS_TABLE = f"{TABLE_NAME}_import_staging_keys"
+VALID_STATUSES = ('active', 'inactive')
+CHUNK_SIZE = 5000
+MERGE_BATCH_SIZE = 50000
+
+KEY_PATTERN = re.compile(rf'^[A-Za-z0-9]{{{KEY_LENGTH}}}$')
+SQL_READ_SIZE = 1 << 20
+SQL_MAX_RECORD = 1 << 20
+SQL_HEADER_MAX = 4096
+SQL_UNESCAPE = {'n': '\n', 't': '\t', 'r': '\r', '0': '\0'}
+
+_SQL_QUOTED = r"'[^'\\]*(?:(?:\\.|'')[^'\\]*)*'(?!')" + r'|"[^"\\]*(?:(?:\\.|"")[^"\\]*)*"(?!")'
+_SQL_CALL = rf"""\([^'"()]*(?:(?:{_SQL_QUOTED})[^'"()]*)*\)"""
+INSERT_PATTERN = re.compile(
+    r'INSERT\s+(?:IGNORE\s+)?INTO\s+(?:`?\w+`?\.)?`?(\w+)`?\s*(?:\(([^)]*)\))?\s*VALUES\s*',
+    re.IGNORECASE,
+)
+SQL_GAP = re.compile(r'(?:\s+|--[^\n]*\n|#[^\n]*\n|/\*.*?\*/)*', re.S)
+SQL_SKIP = re.compile(rf"""[^'";]*(?:(?:{_SQL_QUOTED})[^'";]*)*""", re.S)
+SQL_TUPLE = re.compile(rf"""\s*\(([^'"()]*(?:(?:{_SQL_QUOTED}|{_SQL_CALL})[^'"()]*)*)\)\s*([,;])""", re.S)
+SQL_FIELD = re.compile(rf"""\s*(?!\s)({_SQL_QUOTED}|[^,'"()]*(?:{_SQL_CALL}[^,'"()]*)*)\s*,""", re.S)
+
+
+def detect_format(path: str) -> Optional[str]:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.csv', '.tsv'):
+        return 'csv'
+    if ext in ('.ndjson', '.jsonl', '.json'):
+        return 'ndjson'
+    if ext == '.sql':
+        return 'sql'
+    return None
+
+
+def _row_from_mapping(row: dict) -> Tuple[str, str, str]:
+    key = row.get('license_key', row.get('key')) or ''
+    product = row.get('product') or ''
+    status = row.get('status') or 'active'
+    return str(key).strip(), str(product).strip(), str(status).strip().lower()
+
+
+def _iter_csv_records(reader) -> Iterator[Optional[List[str]]]:
+    """Yield parsed CSV records, or ``None`` for a record the csv module rejects."""
+    while True:
+        try:
+            yield next(reader)
+        except StopIteration:
+            return
+        except csv.Error:
+            # e.g. a field over csv.field_size_limit(); the reader resumes on the next line
+            yield None
+
+
+def iter_csv(path: str) -> Iterator[Optional[Tuple[str, str, str]]]:
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        reader = _iter_csv_records(csv.reader(f, dialect))
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = [c.strip().lower() for c in header]
+        if 'license_key' in columns or 'key' in columns:
+            for values in reader:
+                if values is None:
+                    yield None
+                elif values:
+                    yield _row_from_mapping(dict(zip(columns, values)))
+        else:
+            for values in itertools.chain([header], reader):
+                if values is None:
+                    yield None
+                elif values:
+                    padded = list(values) + ['', '', '']
+                    yield _row_from_mapping({
+                        'license_key': padded[0],
+                        'product': padded[1],
+                        'status': padded[2],
+                    })
+
+
+def iter_ndjson(path: str) -> Iterator[Optional[Tuple[str, str, str]]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                yield None
+                continue
+            yield _row_from_mapping(data) if isinstance(data, dict) else None
+
+
+def _sql_value(raw: str) -> Optional[str]:
+    if raw[:1] in ("'", '"'):
+        quote = raw[0]
+        inner = raw[1:-1]
+        if '\\' in inner or quote * 2 in inner:
+            inner = re.sub(
+                rf"\\(.)|{quote}{quote}",
+                lambda m: SQL_UNESCAPE.get(m.group(1), m.group(1)) if m.group(1) is not None else quote,
+                inner,
+                flags=re.S,
+            )
+        return inner
+    raw = raw.strip()
+    return None if raw.upper() == 'NULL' else raw
+
+
+def _split_sql_fields(body: str) -> List[Optional[str]]:
+    return [_sql_value(raw) for raw in SQL_FIELD.findall(body + ',')]
+
+
+def iter_sql(path: str) -> Iterator[Optional[Tuple[str, str, str]]]:
+    """Stream rows out of ``INSERT INTO <licences>`` statements in a SQL dump.
+
+    The file is read in ``SQL_READ_SIZE`` blocks and tuples are cut out one
+    at a time, so memory is bounded by the block size plus the largest
+    single row, not by the size of an extended INSERT. Other statements are
+    skipped without being buffered.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = ''
+        pos = 0
+        eof = False
+        columns = None
+        target = False
+        skipping = False
+
+        while True:
+            need_more = False
+            if skipping:
+                pos = SQL_SKIP.match(buf, pos).end()
+                if pos < len(buf) and buf[pos] == ';':
+                    pos += 1
+                    skipping = False
+                else:
+                    need_more = True
+            elif columns is None:
+                pos = SQL_GAP.match(buf, pos).end()
+                header = INSERT_PATTERN.match(buf, pos)
+                if header and header.end() < len(buf):
+                    target = header.group(1) == TABLE_NAME
+                    if header.group(2):
+                        columns = [c.strip().strip('`').lower() for c in header.group(2).split(',')]
+                    else:
+                        # Bare mysqldump rows follow the table layout in schema.sql
+                        columns = ['id', 'license_key', 'product', 'status', 'created_at']
+                    pos = header.end()
+                elif pos < len(buf) and (eof or len(buf) - pos >= SQL_HEADER_MAX
+                                         or not 'INSERT'.startswith(buf[pos:pos + 6].upper())):
+                    if buf[pos:pos + 6].upper() == 'INSERT':
+                        # An INSERT we cannot parse may hold licences; surface it as a reject
+                        yield None
+                    skipping = True
+                else:
+                    need_more = True
+            else:
+                row = SQL_TUPLE.match(buf, pos)
+                if row:
+                    pos = row.end()
+                    if target:
+                        yield _row_from_mapping(dict(zip(columns, _split_sql_fields(row.group(1)))))
+                    if row.group(2) == ';':
+                        columns = None
+                elif eof or len(buf) - pos > SQL_MAX_RECORD:
+                    if target:
+                        yield None
+                    columns = None
+                    skipping = True
+                else:
+                    need_more = True
+
+            if need_more:
+                if eof:
+                    return
+                chunk = f.read(SQL_READ_SIZE)
+                buf = buf[pos:] + chunk
+                pos = 0
+                if not chunk:
+                    eof = True
+                    if buf.strip() and not buf.rstrip().endswith(';'):
+                        buf += ';'
+
+
+READERS = {
+    'csv': iter_csv,
+    'ndjson': iter_ndjson,
+    'sql': iter_sql,
+}
+
+
+def validate_row(row: Optional[Tuple[str, str, str]], products: Set[str]) -> Optional[str]:
+    if row is None:
+        return 'malformed record'
+    key, product, status = row
+    if not KEY_PATTERN.match(key):
+        return 'invalid key format'
+    if product not in products:
+        return 'unknown product'
+    if status not in VALID_STATUSES:
+        return 'invalid status'
+    return None
+
+
+def _escape_infile(value: str) -> str:
+    return (value.replace('\\', '\\\\')
+                 .replace('\t', '\\t')
+                 .replace('\n', '\\n')
+                 .replace('\r', '\\r'))
+
+
+class LicenseImporter:
+    def __init__(self, config: dict, products: Set[str]):
+        self.db = LicenseDatabase({**config, 'allow_local_infile': True})
+        self.products = set(products)
+        self.export_folder = CONFIG['license'].get('export_folder', 'database/exports')
+
+    def create_staging_table(self) -> bool:
+        try:
+            cursor = self.db.connection.cursor()
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {STAGING_TABLE}")
+            # Temporary tables are private to this connection, so concurrent
+            # imports never see or drop each other's staging rows
+            cursor.execute(f"""
+                CREATE TEMPORARY TABLE {STAGING_TABLE} (
+                    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    license_key VARCHAR(255) NOT NULL,
+                    product VARCHAR(255) NOT NULL,
+                    status VARCHAR(50) NOT NULL DEFAULT 'active',
+                    outcome VARCHAR(16) DEFAULT NULL,
+                    INDEX idx_license_key (license_key)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+            """)
+            self.db.connection.commit()
+            cursor.close()
+            return True
+        except Error as e:
+            print(f"{Colors.RED}Error creating staging table: {e}{Colors.RESET}")
+            return False
+
+    def drop_staging_table(self):
+        try:
+            cursor = self.db.connection.cursor()
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {STAGING_TABLE}")
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {STAGING_KEYS_TABLE}")
+            cursor.close()
+        except Error as e:
+            print(f"{Colors.RED}Error dropping staging table: {e}{Colors.RESET}")
+
+    def stage_file(self, path: str, fmt: str, rejects_file: str,
+                   use_infile: bool = True) -> Optional[Tuple[int, int, int]]:
+        """Validate ``path`` row by row and load accepted rows into the staging table.
+
+        Returns ``(accepted, rejected, staged)`` or ``None`` if loading failed.
+        ``staged`` is the number of rows the server actually inserted; every
+        accepted row is staged, repeats included, so the merge can report them.
+        Rows are streamed from the reader and sent in ``CHUNK_SIZE`` batches.
+        """
+        reader = READERS[fmt]
+        accepted = 0
+        rejected = 0
+        staged = 0
+
+        with open(rejects_file, 'w', encoding='utf-8', newline='') as rf:
+            rejects = csv.writer(rf)
+            rejects.writerow(['record', 'license_key', 'product', 'status', 'reason'])
+
+            if use_infile:
+                fd, infile = tempfile.mkstemp(prefix='licence_import_', suffix='.tsv')
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as out:
+                        for record, row in enumerate(reader(path), start=1):
+                            reason = validate_row(row, self.products)
+                            if reason:
+                                rejects.writerow([record, *(row or ('', '', '')), reason])
+                                rejected += 1
+                                continue
+                            out.write('\t'.join(_escape_infile(v) for v in row) + '\n')
+                            accepted += 1
+                    staged = self.load_infile(infile)
+                    if staged is None:
+                        print(f"{Colors.YELLOW}LOAD DATA LOCAL INFILE unavailable, falling back to batched inserts...{Colors.RESET}")
+                        if not self.create_staging_table():
+                            return None
+                        staged = self.insert_staging_rows(self._iter_infile(infile))
+                        if staged is None:
+                            return None
+                    return accepted, rejected, staged
+                finally:
+                    os.remove(infile)
+
+            chunk = []
+            for record, row in enumerate(reader(path), start=1):
+                reason = validate_row(row, self.products)
+                if reason:
+                    rejects.writerow([record, *(row or ('', '', '')), reason])
+                    rejected += 1
+                    continue
+                chunk.append(row)
+                accepted += 1
+                if len(chunk) >= CHUNK_SIZE:
+                    inserted = self.insert_staging_rows(chunk)
+                    if inserted is None:
+                        return None
+                    staged += inserted
+                    chunk = []
+            if chunk:
+                inserted = self.insert_staging_rows(chunk)
+                if inserted is None:
+                    return None
+                staged += inserted
+
+        return accepted, rejected, staged
+
+    @staticmethod
+    def _iter_infile(infile: str) -> Iterator[Tuple[str, ...]]:
+        unescape = {'\\\\': '\\', '\\t': '\t', '\\n': '\n', '\\r': '\r'}
+        with open(infile, 'r', encoding='utf-8', newline='\n') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                yield tuple(re.sub(r'\\[\\tnr]', lambda m: unescape[m.group(0)], v) for v in fields)
+
+    def load_infile(self, infile: str) -> Optional[int]:
+        try:
+            cursor = self.db.connection.cursor()
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {STAGING_TABLE} "
+                f"CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                f"LINES TERMINATED BY '\\n' "
+                f"(license_key, product, status)",
+                (infile,),
+            )
+            loaded = cursor.rowcount
+            self.db.connection.commit()
+            cursor.close()
+            return loaded
+        except Error as e:
+            print(f"{Colors.RED}Error loading staging file: {e}{Colors.RESET}")
+            return None
+
+    def insert_staging_rows(self, rows) -> Optional[int]:
+        query = f"INSERT INTO {STAGING_TABLE} (license_key, product, status) VALUES (%s, %s, %s)"
+        inserted = 0
+        chunk = []
+        try:
+            cursor = self.db.connection.cursor()
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= CHUNK_SIZE:
+                    cursor.executemany(query, chunk)
+                    inserted += cursor.rowcount
+                    self.db.connection.commit()
+                    chunk = []
+            if chunk:
+                cursor.executemany(query, chunk)
+                inserted += cursor.rowcount
+                self.db.connection.commit()
+            cursor.close()
+        except Error as e:
+            print(f"{Colors.RED}Error inserting staging rows: {e}{Colors.RESET}")
+            return None
+        return inserted
+
+    def merge(self, apply: bool = True) -> Optional[dict]:
+        """Classify staged rows against the licences table and optionally insert new ones.
+
+        Work is split into ``MERGE_BATCH_SIZE`` id ranges so a large import
+        never holds one huge transaction open.
+        """
+        counts = {'staged': 0, 'added': 0, 'present': 0, 'conflict': 0,
+                  'duplicate': 0, 'file_conflict': 0}
+        try:
+            cursor = self.db.connection.cursor()
+            cursor.execute(f"SELECT COUNT(*), COALESCE(MAX(id), 0) FROM {STAGING_TABLE}")
+            staged, max_id = cursor.fetchone()
+            counts['staged'] = int(staged)
+
+            # MySQL cannot self-join a TEMPORARY table, so per-key totals go
+            # into a second one. Keys the file lists with different products
+            # or statuses are all marked file_conflict and never inserted;
+            # exact repeats after the first row are marked duplicate.
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {STAGING_KEYS_TABLE}")
+            cursor.execute(f"""
+                CREATE TEMPORARY TABLE {STAGING_KEYS_TABLE} (
+                    license_key VARCHAR(255) NOT NULL PRIMARY KEY,
+                    first_id BIGINT NOT NULL,
+                    variants INT NOT NULL
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+            """)
+            cursor.execute(
+                f"INSERT INTO {STAGING_KEYS_TABLE} (license_key, first_id, variants) "
+                f"SELECT license_key, MIN(id), COUNT(DISTINCT product, status) "
+                f"FROM {STAGING_TABLE} GROUP BY license_key HAVING COUNT(*) > 1"
+            )
+            cursor.execute(
+                f"UPDATE {STAGING_TABLE} s "
+                f"JOIN {STAGING_KEYS_TABLE} k ON k.license_key = s.license_key "
+                f"SET s.outcome = CASE "
+                f"WHEN k.variants > 1 THEN 'file_conflict' "
+                f"WHEN s.id <> k.first_id THEN 'duplicate' "
+                f"ELSE NULL END"
+            )
+            self.db.connection.commit()
+
+            for start in range(0, int(max_id), MERGE_BATCH_SIZE):
+                end = start + MERGE_BATCH_SIZE
+                cursor.execute(
+                    f"UPDATE {STAGING_TABLE} s "
+                    f"LEFT JOIN {TABLE_NAME} l ON l.license_key = s.license_key "
+                    f"SET s.outcome = CASE "
+                    f"WHEN l.license_key IS NULL THEN 'added' "
+                    f"WHEN l.product = s.product AND l.status = s.status THEN 'present' "
+                    f"ELSE 'conflict' END "
+                    f"WHERE s.outcome IS NULL AND s.id > %s AND s.id <= %s",
+                    (start, end),
+                )
+                if apply:
+                    cursor.execute(
+                        f"INSERT IGNORE INTO {TABLE_NAME} (license_key, product, status) "
+                        f"SELECT license_key, product, status FROM {STAGING_TABLE} "
+                        f"WHERE outcome = 'added' AND id > %s AND id <= %s",
+                        (start, end),
+                    )
+                self.db.connection.commit()
+
+            cursor.execute(f"SELECT outcome, COUNT(*) FROM {STAGING_TABLE} GROUP BY outcome")
+            for outcome, cnt in cursor.fetchall():
+                if outcome in counts:
+                    counts[outcome] = int(cnt)
+            cursor.close()
+        except Error as e:
+            print(f"{Colors.RED}Error merging staged licences: {e}{Colors.RESET}")
+            return None
+        return counts
+
+    def write_diff(self, diff_file: str) -> bool:
+        try:
+            cursor = self.db.connection.cursor()
+            cursor.execute(
+                f"SELECT s.outcome, s.license_key, s.product, s.status, l.product, l.status "
+                f"FROM {STAGING_TABLE} s "
+                f"LEFT JOIN {TABLE_NAME} l ON l.license_key = s.license_key "
+                f"ORDER BY s.id"
+            )
+            with open(diff_file, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['outcome', 'license_key', 'import_product', 'import_status',
+                                 'existing_product', 'existing_status'])
+                while True:
+                    rows = cursor.fetchmany(CHUNK_SIZE)
+                    if not rows:
+                        break
+                    for outcome, key, product, status, existing_product, existing_status in rows:
+                        if outcome == 'added':
+                            existing_product, existing_status = '', ''
+                        writer.writerow([outcome, key, product, status,
+                                         existing_product or '', existing_status or ''])
+            cursor.close()
+            return True
+        except Error as e:
+            print(f"{Colors.RED}Error writing import diff: {e}{Colors.RESET}")
+            return False
+
+    def run_import(self, path: str, fmt: str = None, apply: bool = True, use_infile: bool = True) -> Optional[dict]:
+        fmt = fmt or detect_format(path)
+        if fmt not in READERS:
+            print(f"{Colors.RED}Unsupported import format for {path}{Colors.RESET}")
+            return None
+
+        if not self.db.connect():
+            return None
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(self.export_folder, exist_ok=True)
+        rejects_file = os.path.join(self.export_folder, f"import_{timestamp}_{os.getpid()}_rejects.csv")
+        diff_file = os.path.join(self.export_folder, f"import_{timestamp}_{os.getpid()}_diff.csv")
+
+        try:
+            if not self.create_staging_table():
+                return None
+            try:
+                staged = self.stage_file(path, fmt, rejects_file, use_infile)
+            except (OSError, UnicodeDecodeError, csv.Error) as e:
+                print(f"{Colors.RED}Error reading {path}: {e}{Colors.RESET}")
+                return None
+            if staged is None:
+                return None
+            accepted, rejected, inserted = staged
+            if inserted != accepted:
+                print(f"{Colors.RED}Only {inserted} of {accepted} accepted rows were staged{Colors.RESET}")
+                return None
+            counts = self.merge(apply)
+            if counts is None or not self.write_diff(diff_file):
+                return None
+            counts.update({
+                'accepted': accepted,
+                'rejected': rejected,
+                'duplicates': counts['duplicate'],
+                'applied': apply,
+                'rejects_file': rejects_file,
+                'diff_file': diff_file,
+            })
+            return counts
+        finally:
+            self.drop_staging_table()
+            self.db.disconnect()
@@ -0,0 +1,502 @@
+"""
+Safety Blur verification load generator
+Synthesizes verify.php traffic and reports how the license audit queries scale
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from mysql.connector import Error
+from mysql.connector.pooling import MySQLConnectionPool
+
+from license_generator import (
+    Colors,
+    DB_CONFIG,
+    LicenseDatabase,
+    LicenseKeyGenerator,
+    TABLE_NAME,
+)
+
+
+LOG_TABLE = 'verification_logs'
+# Licences seeded by this tool belong to a product no real panel sends,
+# so they can never validate a customer install
+LOAD_PRODUCT = 'safetyblur-loadtest'
+CONTROLLER_HASH = 'c19a677e07d393f6b32ccd9cf1cb9c003b0ec77e5e3789e03e00832f4f07d5fe'
+PANEL_VERSIONS = ['1.11.7', '1.11.8', '1.11.9', '1.11.10', '1.11.11']
+DEFAULT_MILESTONES = [10_000, 100_000, 1_000_000, 10_000_000, 50_000_000]
+BATCH_SIZE = 5000
+REPLAY_WINDOW = 4
+MAX_POOL_SIZE = 32
+
+LOG_COLUMNS = (
+    'license_key', 'product', 'domain', 'owner_name', 'panel_version',
+    'server_ip', 'controller_hash', 'ip_address', 'request_status',
+)
+
+
+class TrafficGenerator:
+    """Produce verify.php request bodies for a fixed population of panels.
+
+    Honest keys stay on one domain (occasionally two, e.g. a migration).
+    A share of keys is marked abusive and spread across many domains, and
+    a small fraction of requests carry unknown keys or a tampered
+    controller hash, mirroring what the endpoint sees in the wild. A share
+    of licences is never sent at all, so ``find_unused_keys`` keeps a
+    realistic result size however large the log grows.
+    """
+
+    def __init__(self, licences: List[Tuple[str, str, str]], abusive_ratio: float = 0.02,
+                 abusive_domains: int = 25, invalid_ratio: float = 0.01,
+                 tampered_ratio: float = 0.002, unused_ratio: float = 0.1,
+                 seed: Optional[int] = None):
+        self.random = random.Random(seed)
+        self.status_by_key = {key: (product, status) for key, product, status in licences}
+        self.invalid_ratio = invalid_ratio
+        self.tampered_ratio = tampered_ratio
+
+        unused = set(self.random.sample(range(len(licences)), int(len(licences) * unused_ratio)))
+        self.unused = [lic for idx, lic in enumerate(licences) if idx in unused]
+        self.licences = [lic for idx, lic in enumerate(licences) if idx not in unused]
+
+        abusive_count = min(int(len(licences) * abusive_ratio), len(self.licences))
+        abusive = set(self.random.sample(range(len(self.licences)), abusive_count))
+        self.panels: Dict[str, List[dict]] = {}
+        for idx, (key, product, status) in enumerate(self.licences):
+            domain_count = abusive_domains if idx in abusive else self.random.choice([1, 1, 1, 1, 2])
+            self.panels[key] = [self._panel(key, n) for n in range(domain_count)]
+
+    def _panel(self, key: str, n: int) -> dict:
+        tag = f"{key[:6].lower()}{n}"
+        return {
+            'domain': f"panel-{tag}.example.net",
+            'owner_name': f"owner_{tag}",
+            'panel_version': self.random.choice(PANEL_VERSIONS),
+            'ip_address': self._ip(),
+        }
+
+    def _ip(self) -> str:
+        return '.'.join(str(self.random.randint(1, 254)) for _ in range(4))
+
+    def request(self) -> dict:
+        roll = self.random.random()
+        if not self.licences or roll < self.invalid_ratio:
+            key = LicenseKeyGenerator.generate_key()
+            product = LOAD_PRODUCT
+            info = self._panel(key, 0)
+        else:
+            key, product, _ = self.random.choice(self.licences)
+            info = dict(self.random.choice(self.panels[key]))
+
+        info['controller_hash'] = CONTROLLER_HASH
+        if self.random.random() < self.tampered_ratio:
+            info['controller_hash'] = os.urandom(32).hex()
+        return {'key': key, 'product': product, 'info': info}
+
+    def status_for(self, body: dict) -> str:
+        found = self.status_by_key.get(body['key'])
+        if found is None or found[0] != body['product']:
+            return 'invalid'
+        return 'good' if found[1] == 'active' else 'bad'
+
+    def log_rows(self, count: int) -> Iterator[tuple]:
+        """Yield verification_logs rows as verify.php would have written them."""
+        for _ in range(count):
+            body = self.request()
+            if body['info']['controller_hash'] != CONTROLLER_HASH:
+                # verify.php rejects these before touching the database
+                continue
+            info = body['info']
+            yield (body['key'], body['product'], info['domain'], info['owner_name'],
+                   info['panel_version'], info['ip_address'], info['controller_hash'],
+                   self._ip(), self.status_for(body))
+
+
+class RateLimiter:
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self, units: int = 1):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(self.next_at, now)
+            self.next_at = start + self.interval * units
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class VerifyStandIn(BaseHTTPRequestHandler):
+    """Minimal stand-in for verify.php backed by the rehearsal database.
+
+    Rate limiting is intentionally left out so every request reaches
+    verification_logs; responses are never signed. Connections come from a
+    shared pool because the server starts a new thread per request.
+    """
+
+    log_table = LOG_TABLE
+    pool = None
+    # get_connection() fails at once when the pool is empty, so requests
+    # queue on this semaphore instead of turning into 500s
+    slots = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, code: int, status: str):
+        payload = json.dumps({'status': status, 'signature': '', 'timestamp': int(time.time())}).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._respond(405, 'invalid')
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            data = json.loads(self.rfile.read(length) or b'null')
+        except (ValueError, json.JSONDecodeError):
+            data = None
+        if not isinstance(data, dict) or not all(k in data for k in ('key', 'product', 'info')):
+            self._respond(400, 'invalid')
+            return
+
+        info = data['info'] if isinstance(data['info'], dict) else {}
+        if info.get('controller_hash') != CONTROLLER_HASH:
+            self._respond(401, 'invalid')
+            return
+
+        with self.slots:
+            conn = None
+            try:
+                conn = self.pool.get_connection()
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"SELECT status FROM {TABLE_NAME} WHERE license_key = %s AND product = %s LIMIT 1",
+                    (data['key'], data['product']),
+                )
+                row = cursor.fetchone()
+                if row and row[0] == 'active':
+                    status, code = 'good', 200
+                elif row and row[0] == 'inactive':
+                    status, code = 'bad', 403
+                else:
+                    status, code = 'invalid', 401
+                cursor.execute(
+                    f"INSERT INTO {self.log_table} ({', '.join(LOG_COLUMNS)}) "
+                    f"VALUES ({', '.join(['%s'] * len(LOG_COLUMNS))})",
+                    (data['key'], data['product'], info.get('domain'), info.get('owner_name'),
+                     info.get('panel_version'), info.get('ip_address'), info.get('controller_hash'),
+                     self.client_address[0], status),
+                )
+                conn.commit()
+                cursor.close()
+            except Error as e:
+                print(f"{Colors.RED}Stand-in database error: {e}{Colors.RESET}")
+                self._respond(500, 'invalid')
+                return
+            finally:
+                if conn is not None:
+                    conn.close()
+        self._respond(code, status)
+
+
+class LoadHarness:
+    def __init__(self, config: dict, log_table: str = LOG_TABLE):
+        self.db = LicenseDatabase(config)
+        self.log_table = log_table
+        self.row_count = 0
+
+    def create_log_table(self) -> bool:
+        try:
+            cursor = self.db.connection.cursor()
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.log_table} (
+                    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    license_key VARCHAR(255) NOT NULL,
+                    product VARCHAR(255) NOT NULL,
+                    domain VARCHAR(255) DEFAULT NULL,
+                    owner_name VARCHAR(255) DEFAULT NULL,
+                    panel_version VARCHAR(50) DEFAULT NULL,
+                    server_ip VARCHAR(45) DEFAULT NULL,
+                    controller_hash VARCHAR(64) DEFAULT NULL,
+                    ip_address VARCHAR(45) DEFAULT NULL,
+                    request_status VARCHAR(20) NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    INDEX idx_license_key (license_key)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+            """)
+            self.db.connection.commit()
+            cursor.close()
+            return True
+        except Error as e:
+            print(f"{Colors.RED}Error creating {self.log_table}: {e}{Colors.RESET}")
+            return False
+
+    def count_rows(self) -> int:
+        try:
+            cursor = self.db.connection.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM {self.log_table}")
+            count = int(cursor.fetchone()[0])
+            cursor.close()
+            return count
+        except Error as e:
+            print(f"{Colors.RED}Error counting {self.log_table}: {e}{Colors.RESET}")
+            return 0
+
+    def load_licences(self, product: str = LOAD_PRODUCT) -> List[Tuple[str, str, str]]:
+        try:
+            cursor = self.db.connection.cursor()
+            cursor.execute(
+                f"SELECT license_key, product, status FROM {TABLE_NAME} WHERE product = %s ORDER BY id",
+                (product,),
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+            return [(row[0], row[1], row[2]) for row in rows]
+        except Error as e:
+            print(f"{Colors.RED}Error loading licences: {e}{Colors.RESET}")
+            return []
+
+    def seed_licences(self, count: int, product: str = LOAD_PRODUCT) -> int:
+        keys = LicenseKeyGenerator.generate_multiple_keys(count)
+        query = f"INSERT IGNORE INTO {TABLE_NAME} (license_key, product, status) VALUES (%s, %s, %s)"
+        inserted = 0
+        try:
+            cursor = self.db.connection.cursor()
+            for start in range(0, len(keys), BATCH_SIZE):
+                chunk = [(key, product, 'active') for key in keys[start:start + BATCH_SIZE]]
+                cursor.executemany(query, chunk)
+                self.db.connection.commit()
+                inserted += cursor.rowcount
+            cursor.close()
+        except Error as e:
+            print(f"{Colors.RED}Error seeding licences: {e}{Colors.RESET}")
+        return inserted
+
+    def write_direct(self, traffic: TrafficGenerator, count: int, limiter: RateLimiter) -> int:
+        query = (
+            f"INSERT INTO {self.log_table} ({', '.join(LOG_COLUMNS)}) "
+            f"VALUES ({', '.join(['%s'] * len(LOG_COLUMNS))})"
+        )
+        written = 0
+        try:
+            cursor = self.db.connection.cursor()
+            while written < count:
+                chunk = list(traffic.log_rows(min(BATCH_SIZE, count - written)))
+                if not chunk:
+                    continue
+                limiter.wait(len(chunk))
+                cursor.executemany(query, chunk)
+                self.db.connection.commit()
+                written += len(chunk)
+            cursor.close()
+        except Error as e:
+            print(f"{Colors.RED}Error writing {self.log_table}: {e}{Colors.RESET}")
+        self.row_count += written
+        return written
+
+    def replay(self, traffic: TrafficGenerator, count: int, limiter: RateLimiter,
+               url: str, workers: int = 16) -> int:
+        def send(body: dict) -> bool:
+            limiter.wait()
+            request = urllib.request.Request(
+                url, data=json.dumps(body).encode(),
+                headers={'Content-Type': 'application/json'}, method='POST',
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    response.read()
+            except urllib.error.HTTPError as e:
+                e.read()
+            except (urllib.error.URLError, OSError):
+                return False
+            return body['info']['controller_hash'] == CONTROLLER_HASH
+
+        # Executor.map would drain the whole generator up front, so keep at
+        # most REPLAY_WINDOW requests per worker queued at any time
+        logged = 0
+        pending = set()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for _ in range(count):
+                if len(pending) >= workers * REPLAY_WINDOW:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    logged += sum(f.result() for f in done)
+                pending.add(pool.submit(send, traffic.request()))
+            logged += sum(f.result() for f in wait(pending).done)
+        self.row_count += logged
+        return logged
+
+    def time_queries(self, repeat: int = 3) -> Dict[str, float]:
+        queries = {
+            'find_warning_keys': lambda: self.db.find_warning_keys(self.log_table),
+            'find_multiple_domain_keys': lambda: self.db.find_multiple_domain_keys(self.log_table),
+            'find_unused_keys': lambda: self.db.find_unused_keys(self.log_table),
+        }
+        timings = {}
+        for name, query in queries.items():
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                query()
+                samples.append((time.perf_counter() - start) * 1000)
+            timings[name] = statistics.median(samples)
+        return timings
+
+
+def start_stand_in(host: str, port: int, log_table: str, config: dict,
+                   pool_size: int = 16) -> Tuple[ThreadingHTTPServer, str]:
+    pool_size = max(1, min(pool_size, MAX_POOL_SIZE))
+    VerifyStandIn.log_table = log_table
+    VerifyStandIn.pool = MySQLConnectionPool(pool_name='safetyblur_stand_in', pool_size=pool_size, **config)
+    VerifyStandIn.slots = threading.BoundedSemaphore(pool_size)
+    server = ThreadingHTTPServer((host, port), VerifyStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    bound_host, bound_port = server.server_address[:2]
+    return server, f"http://{bound_host}:{bound_port}/api/v1/blueprint/safetyblur/verify.php"
+
+
+def print_report(results: List[Tuple[int, Dict[str, float]]]):
+    names = ['find_warning_keys', 'find_multiple_domain_keys', 'find_unused_keys']
+    print(f"\n{Colors.YELLOW}Audit query latency (median ms){Colors.RESET}")
+    print(f"{'rows':>12}  " + '  '.join(f"{n:>26}" for n in names))
+    print("─" * (14 + 28 * len(names)))
+    base = results[0][1] if results else {}
+    for rows, timings in results:
+        cells = []
+        for n in names:
+            factor = timings[n] / base[n] if base.get(n) else 0.0
+            cells.append(f"{timings[n]:>14.1f} ({factor:>7.1f}x)")
+        print(f"{rows:>12,}  " + '  '.join(f"{c:>26}" for c in cells))
+
+
+def check_target(database: str, confirmed: bool) -> Optional[str]:
+    """Return why the rehearsal target is unsafe, or ``None`` if it may be written to."""
+    if not database:
+        return "--database is required: name a dedicated rehearsal database"
+    if not re.fullmatch(r'\w+', database):
+        return f"--database must be a plain identifier, got {database!r}"
+    if database == DB_CONFIG.get('database'):
+        return f"--database must not be the configured database ({database})"
+    if not confirmed:
+        return "pass --confirm to allow writing synthetic traffic to the rehearsal database"
+    return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Rehearse verification_logs growth and audit query latency.')
+    parser.add_argument('--mode', choices=['direct', 'replay'], default='direct',
+                        help='write rows straight into the log table, or POST them to a verify endpoint')
+    parser.add_argument('--database', help='rehearsal database to write to (must differ from config.json)')
+    parser.add_argument('--confirm', action='store_true',
+                        help='confirm that the rehearsal database may be filled with synthetic data')
+    parser.add_argument('--url', help='verify endpoint for replay mode (defaults to a local stand-in); '
+                                      'it must be backed by the rehearsal database')
+    parser.add_argument('--port', type=int, default=0, help='port for the local stand-in (0 = any free port)')
+    parser.add_argument('--rate', type=float, default=0, help='rows or requests per second (0 = unthrottled)')
+    parser.add_argument('--workers', type=int, default=16,
+                        help=f'concurrent replay clients (stand-in uses at most {MAX_POOL_SIZE} '
+                             f'database connections; extra requests wait for one)')
+    parser.add_argument('--milestones', default=','.join(str(m) for m in DEFAULT_MILESTONES),
+                        help='comma separated table sizes at which to measure')
+    parser.add_argument('--licences', type=int, default=10_000,
+                        help=f'minimum number of {LOAD_PRODUCT} licences to seed in the rehearsal database')
+    parser.add_argument('--abusive-ratio', type=float, default=0.02)
+    parser.add_argument('--abusive-domains', type=int, default=25)
+    parser.add_argument('--unused-ratio', type=float, default=0.1,
+                        help='share of seeded licences that never appear in traffic')
+    parser.add_argument('--repeat', type=int, default=3, help='timing samples per query')
+    parser.add_argument('--log-table', default=LOG_TABLE)
+    parser.add_argument('--seed', type=int)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    milestones = sorted(int(m) for m in args.milestones.split(',') if m.strip())
+
+    problem = check_target(args.database, args.confirm)
+    if problem:
+        print(f"{Colors.RED}{problem}{Colors.RESET}")
+        sys.exit(2)
+
+    config = {**DB_CONFIG, 'database': args.database}
+    print(f"{Colors.YELLOW}Writing synthetic traffic to {args.database}.{args.log_table}{Colors.RESET}")
+
+    harness = LoadHarness(config, args.log_table)
+    if not harness.db.database_exists() and not harness.db.create_database():
+        sys.exit(1)
+    if not harness.db.connect():
+        sys.exit(1)
+    harness.db.create_table_if_not_exists()
+    if not harness.create_log_table():
+        sys.exit(1)
+
+    licences = harness.load_licences()
+    if len(licences) < args.licences:
+        print(f"{Colors.YELLOW}Seeding {args.licences - len(licences)} {LOAD_PRODUCT} licences...{Colors.RESET}")
+        harness.seed_licences(args.licences - len(licences))
+        licences = harness.load_licences()
+
+    traffic = TrafficGenerator(licences, args.abusive_ratio, args.abusive_domains,
+                               unused_ratio=args.unused_ratio, seed=args.seed)
+    limiter = RateLimiter(args.rate)
+
+    server = None
+    url = args.url
+    if args.mode == 'replay' and not url:
+        try:
+            server, url = start_stand_in('127.0.0.1', args.port, args.log_table, config, args.workers)
+        except Error as e:
+            print(f"{Colors.RED}Error starting stand-in: {e}{Colors.RESET}")
+            harness.db.disconnect()
+            sys.exit(1)
+        print(f"{Colors.CYAN}Stand-in listening on {url}{Colors.RESET}")
+
+    harness.row_count = harness.count_rows()
+    results = []
+    try:
+        for target in milestones:
+            missing = target - harness.row_count
+            if missing > 0:
+                print(f"{Colors.YELLOW}Growing {args.log_table} to {target:,} rows...{Colors.RESET}")
+                if args.mode == 'replay':
+                    harness.replay(traffic, missing, limiter, url, args.workers)
+                    # Rejected or failed requests never reach the table
+                    harness.row_count = harness.count_rows()
+                else:
+                    harness.write_direct(traffic, missing, limiter)
+            timings = harness.time_queries(args.repeat)
+            results.append((harness.row_count, timings))
+            print(f"{Colors.GREEN}✓ {harness.row_count:,} rows measured{Colors.RESET}")
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}Interrupted, reporting measurements so far.{Colors.RESET}")
+    finally:
+        if server is not None:
+            server.shutdown()
+        harness.db.disconnect()
+
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path: str):
+    """Hold an exclusive advisory lock on ``path + '.lock'`` for the duration of the block."""
+    with open(path + '.lock', 'a+') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        else:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _file_mode(path: str) -> int:
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def atomic_write_json(path: str, data, indent: int = 4):
+    """Write ``data`` to a temp file next to ``path`` and rename it into place.
+
+    The replacement keeps the permissions of the file it replaces, since
+    ``mkstemp`` would otherwise leave it readable by the owner only.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    mode = _file_mode(path)
+    fd, tmp = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', dir=directory)
+    try:
+        os.chmod(tmp, mode)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def locked_update_json(path: str, update):
+    """Re-read ``path`` under its lock, apply ``update`` to the data and write it back atomically."""
+    with file_lock(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        update(data)
+        atomic_write_json(path, data)
+    return data
+
+
+class ProductCatalog:
+    def __init__(self, path: str):
+        self.path = path
+        self._products = None
+        self._index = set()
+        self._stamp = None
+
+    def _current_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _read(self) -> Optional[List[str]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, OSError):
+            return []
+        return data if isinstance(data, list) else []
+
+    def _refresh(self, force: bool = False):
+        stamp = self._current_stamp()
+        if not force and self._stamp is not None and stamp == self._stamp:
+            return
+        self._products = self._read()
+        self._index = set(self._products or [])
+        self._stamp = stamp
+
+    def products(self) -> Optional[List[str]]:
+        """Return the catalog, or ``None`` if products.json does not exist."""
+        self._refresh()
+        return None if self._products is None else list(self._products)
+
+    def __contains__(self, product: str) -> bool:
+        self._refresh()
+        return product in self._index
+
+    def names(self) -> set:
+        self._refresh()
+        return set(self._index)
+
+    def save(self, products: List[str]):
+        with file_lock(self.path):
+            atomic_write_json(self.path, products)
+            self._refresh(force=True)
+
+    def add(self, product: str) -> bool:
+        with file_lock(self.path):
+            # Re-read under the lock so a concurrent writer's additions are kept
+            self._refresh(force=True)
+            if product in self._index:
+                return False
+            products = list(self._products or [])
+            products.append(product)
+            atomic_write_json(self.path, products)
+            self._refresh(force=True)
+            return True
+
+    def sync_to_database(self, db) -> int:
+        products = self.products()
+        if not products:
+            return 0
+        return db.sync_products(products)
@@ -0,0 +1,111 @@
+import pytest
+
+import license_importer
+from license_importer import (
+    detect_format,
+    iter_csv,
+    iter_ndjson,
+    iter_sql,
+    validate_row,
+)
+
+KEY_A = 'abcdefghijabcdefghijabcdefghij12'
+KEY_B = 'ABCDEFGHIJabcdefghijabcdefghij12'
+
+
+def write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def test_detect_format():
+    assert detect_format('dump.csv') == 'csv'
+    assert detect_format('dump.NDJSON') == 'ndjson'
+    assert detect_format('dump.sql') == 'sql'
+    assert detect_format('dump.txt') is None
+
+
+def test_iter_csv_with_header(tmp_path):
+    path = write(tmp_path, 'a.csv', f"product,key\nsafetyblur,{KEY_A}\n\nsafetyblur,{KEY_B}\n")
+    assert list(iter_csv(path)) == [
+        (KEY_A, 'safetyblur', 'active'),
+        (KEY_B, 'safetyblur', 'active'),
+    ]
+
+
+def test_iter_csv_without_header(tmp_path):
+    path = write(tmp_path, 'a.csv', f"{KEY_A},safetyblur,INACTIVE\n{KEY_B},safetyblur,active\n")
+    assert list(iter_csv(path)) == [
+        (KEY_A, 'safetyblur', 'inactive'),
+        (KEY_B, 'safetyblur', 'active'),
+    ]
+
+
+def test_iter_ndjson_flags_malformed_records(tmp_path):
+    path = write(tmp_path, 'a.ndjson', f'{{"license_key": "{KEY_A}", "product": "safetyblur"}}\nnot json\n[1]\n')
+    assert list(iter_ndjson(path)) == [(KEY_A, 'safetyblur', 'active'), None, None]
+
+
+SQL_DUMP = f"""-- MySQL dump
+/*!40101 SET NAMES utf8mb4 */;
+DROP TABLE IF EXISTS `licences`;
+CREATE TABLE `licences` (`id` int, `note` varchar(10) DEFAULT 'x;y');
+INSERT INTO `licences` VALUES (1,'{KEY_A}','safe''ty;blur','active',NOW()),(2,'{KEY_B}','safetyblur','inactive',NULL),
+(3,'x\\'y','p\\\\q','active','2024-01-01');
+INSERT INTO other VALUES (1,'zzz');
+INSERT INTO licences (license_key, product, status) VALUES ('{KEY_A}', "safety""blur", 'active')
+"""
+
+SQL_ROWS = [
+    (KEY_A, "safe'ty;blur", 'active'),
+    (KEY_B, 'safetyblur', 'inactive'),
+    ("x'y", 'p\\q', 'active'),
+    (KEY_A, 'safety"blur', 'active'),
+]
+
+
+def test_iter_sql_handles_escapes_functions_and_other_tables(tmp_path):
+    path = write(tmp_path, 'dump.sql', SQL_DUMP)
+    assert list(iter_sql(path)) == SQL_ROWS
+
+
+@pytest.mark.parametrize('read_size', [1, 2, 3, 7, 16, 64])
+def test_iter_sql_is_independent_of_read_boundaries(tmp_path, monkeypatch, read_size):
+    path = write(tmp_path, 'dump.sql', SQL_DUMP)
+    monkeypatch.setattr(license_importer, 'SQL_READ_SIZE', read_size)
+    assert list(iter_sql(path)) == SQL_ROWS
+
+
+def test_iter_sql_reports_unparseable_tuple(tmp_path):
+    path = write(tmp_path, 'dump.sql', f"INSERT INTO licences VALUES (1,'{KEY_A}','safetyblur','active',NULL),(2,'broken")
+    assert list(iter_sql(path)) == [(KEY_A, 'safetyblur', 'active'), None]
+
+
+def test_validate_row():
+    products = {'safetyblur'}
+    assert validate_row((KEY_A, 'safetyblur', 'active'), products) is None
+    assert validate_row(None, products) == 'malformed record'
+    assert validate_row(('short', 'safetyblur', 'active'), products) == 'invalid key format'
+    assert validate_row((KEY_A[:-1] + '-', 'safetyblur', 'active'), products) == 'invalid key format'
+    assert validate_row((KEY_A, 'other', 'active'), products) == 'unknown product'
+    assert validate_row((KEY_A, 'safetyblur', 'revoked'), products) == 'invalid status'
+
+
+def test_iter_csv_rejects_oversized_field_and_continues(tmp_path):
+    huge = 'x' * 200000
+    path = write(tmp_path, 'a.csv', f'key,product\n"{huge}",safetyblur\n{KEY_A},safetyblur\n')
+    rows = list(iter_csv(path))
+    assert rows[0] is None
+    assert rows[-1] == (KEY_A, 'safetyblur', 'active')
+
+
+def test_iter_sql_accepts_database_qualified_table(tmp_path):
+    path = write(tmp_path, 'dump.sql', f"INSERT INTO `shop`.`licences` VALUES (1,'{KEY_A}','safetyblur','active',NULL);\n")
+    assert list(iter_sql(path)) == [(KEY_A, 'safetyblur', 'active')]
+
+
+def test_iter_sql_reports_unparseable_insert_statement(tmp_path):
+    path = write(tmp_path, 'dump.sql', f"INSERT INTO licences SET license_key = '{KEY_A}';\n"
+                                       f"INSERT INTO licences VALUES (1,'{KEY_B}','safetyblur','active',NULL);\n")
+    assert list(iter_sql(path)) == [None, (KEY_B, 'safetyblur', 'active')]
@@ -0,0 +1,177 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+
+import pytest
+from mysql.connector.errors import PoolError
+
+import load_generator
+from load_generator import (
+    CONTROLLER_HASH,
+    LOAD_PRODUCT,
+    LoadHarness,
+    RateLimiter,
+    TrafficGenerator,
+    VerifyStandIn,
+    check_target,
+)
+
+LICENCES = [(f"k{i:031d}", LOAD_PRODUCT, 'active') for i in range(200)]
+
+
+def test_status_for():
+    traffic = TrafficGenerator([('good0', LOAD_PRODUCT, 'active'), ('bad0', LOAD_PRODUCT, 'inactive')], seed=1)
+    assert traffic.status_for({'key': 'good0', 'product': LOAD_PRODUCT}) == 'good'
+    assert traffic.status_for({'key': 'bad0', 'product': LOAD_PRODUCT}) == 'bad'
+    assert traffic.status_for({'key': 'good0', 'product': 'other'}) == 'invalid'
+    assert traffic.status_for({'key': 'missing', 'product': LOAD_PRODUCT}) == 'invalid'
+
+
+def test_abusive_keys_span_many_domains():
+    traffic = TrafficGenerator(LICENCES, abusive_ratio=0.05, abusive_domains=25, seed=7)
+    domain_counts = sorted(len(panels) for panels in traffic.panels.values())
+    assert domain_counts.count(25) == 10
+    assert set(domain_counts[:-10]) <= {1, 2}
+
+
+def test_requests_only_use_synthetic_licences():
+    traffic = TrafficGenerator(LICENCES, invalid_ratio=0.2, seed=3)
+    known = {key for key, _, _ in LICENCES}
+    for _ in range(500):
+        body = traffic.request()
+        assert body['product'] == LOAD_PRODUCT
+        assert set(body['info']) == {'domain', 'owner_name', 'panel_version', 'ip_address', 'controller_hash'}
+        if body['key'] not in known:
+            assert traffic.status_for(body) == 'invalid'
+
+
+def test_log_rows_drop_tampered_requests():
+    traffic = TrafficGenerator(LICENCES, tampered_ratio=0.5, seed=5)
+    rows = list(traffic.log_rows(400))
+    assert 100 < len(rows) < 300
+    assert all(row[6] == CONTROLLER_HASH for row in rows)
+
+
+def test_rate_limiter_spaces_calls(monkeypatch):
+    clock = [100.0]
+    sleeps = []
+    monkeypatch.setattr(load_generator.time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(load_generator.time, 'sleep', sleeps.append)
+
+    limiter = RateLimiter(10)
+    limiter.wait(5)
+    limiter.wait(5)
+    limiter.wait()
+    assert sleeps == [pytest.approx(0.5), pytest.approx(1.0)]
+
+
+def test_rate_limiter_unthrottled(monkeypatch):
+    monkeypatch.setattr(load_generator.time, 'sleep', lambda _: pytest.fail('should not sleep'))
+    RateLimiter(0).wait(1000)
+
+
+def test_replay_keeps_a_bounded_window(monkeypatch):
+    lock = threading.Lock()
+    state = {'submitted': 0, 'finished': 0, 'peak': 0}
+
+    class CountingTraffic(TrafficGenerator):
+        def request(self):
+            with lock:
+                state['submitted'] += 1
+                state['peak'] = max(state['peak'], state['submitted'] - state['finished'])
+            return super().request()
+
+    def fake_urlopen(request, timeout):
+        with lock:
+            state['finished'] += 1
+        raise urllib.error.URLError('offline')
+
+    monkeypatch.setattr(load_generator.urllib.request, 'urlopen', fake_urlopen)
+    harness = LoadHarness({})
+    traffic = CountingTraffic(LICENCES, seed=1)
+    assert harness.replay(traffic, 2000, RateLimiter(0), 'http://127.0.0.1:9/', workers=4) == 0
+    assert state['submitted'] == 2000
+    assert state['peak'] <= 4 * load_generator.REPLAY_WINDOW + 1
+
+
+def test_check_target(monkeypatch):
+    monkeypatch.setitem(load_generator.DB_CONFIG, 'database', 'licences')
+    assert check_target(None, True)
+    assert check_target('licences', True)
+    assert check_target('rehearsal; DROP', True)
+    assert check_target('licences_rehearsal', False)
+    assert check_target('licences_rehearsal', True) is None
+
+
+def test_unused_share_never_appears_in_traffic():
+    traffic = TrafficGenerator(LICENCES, unused_ratio=0.25, invalid_ratio=0, seed=11)
+    unused = {key for key, _, _ in traffic.unused}
+    assert len(unused) == 50
+    assert not unused & set(traffic.panels)
+    seen = {traffic.request()['key'] for _ in range(5000)}
+    assert not seen & unused
+    assert len(seen) == 150
+
+
+class FakeCursor:
+    def execute(self, query, params=None):
+        time.sleep(0.01)
+
+    def fetchone(self):
+        return ('active',)
+
+    def close(self):
+        pass
+
+
+class FakePool:
+    def __init__(self, size):
+        self.size = size
+        self.in_use = 0
+        self.lock = threading.Lock()
+
+    def get_connection(self):
+        with self.lock:
+            if self.in_use >= self.size:
+                raise PoolError('Failed getting connection; pool exhausted')
+            self.in_use += 1
+        pool = self
+
+        class Connection:
+            def cursor(self):
+                return FakeCursor()
+
+            def commit(self):
+                pass
+
+            def close(self):
+                with pool.lock:
+                    pool.in_use -= 1
+
+        return Connection()
+
+
+def test_stand_in_queues_requests_beyond_pool_size(monkeypatch):
+    monkeypatch.setattr(VerifyStandIn, 'pool', FakePool(2))
+    monkeypatch.setattr(VerifyStandIn, 'slots', threading.BoundedSemaphore(2))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), VerifyStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    body = TrafficGenerator(LICENCES, tampered_ratio=0, seed=2).request()
+
+    def post(_):
+        request = urllib.request.Request(url, data=json.dumps(body).encode(), method='POST')
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status
+
+    try:
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            statuses = list(pool.map(post, range(24)))
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert statuses == [200] * 24
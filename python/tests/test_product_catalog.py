@@ -0,0 +1,103 @@
+import json
+import multiprocessing
+import os
+import stat
+
+from product_catalog import ProductCatalog, atomic_write_json, locked_update_json
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def test_missing_file_returns_none(tmp_path):
+    catalog = ProductCatalog(str(tmp_path / 'products.json'))
+    assert catalog.products() is None
+    assert 'safetyblur' not in catalog
+
+
+def test_cache_is_reused_until_file_changes(tmp_path, monkeypatch):
+    path = str(tmp_path / 'products.json')
+    write_json(path, ['safetyblur'])
+    catalog = ProductCatalog(path)
+
+    reads = []
+    original = catalog._read
+    monkeypatch.setattr(catalog, '_read', lambda: reads.append(1) or original())
+
+    assert catalog.products() == ['safetyblur']
+    assert 'safetyblur' in catalog
+    assert catalog.names() == {'safetyblur'}
+    assert len(reads) == 1
+
+    write_json(path, ['safetyblur', 'other-product'])
+    assert 'other-product' in catalog
+    assert len(reads) == 2
+
+
+def test_invalid_json_yields_empty_catalog(tmp_path):
+    path = tmp_path / 'products.json'
+    path.write_text('{not json', encoding='utf-8')
+    assert ProductCatalog(str(path)).products() == []
+
+
+def test_add_keeps_entries_written_by_another_process(tmp_path):
+    path = str(tmp_path / 'products.json')
+    write_json(path, ['safetyblur'])
+    catalog = ProductCatalog(path)
+    assert catalog.products() == ['safetyblur']
+
+    ProductCatalog(path).add('added-elsewhere')
+    assert catalog.add('added-here') is True
+    assert catalog.add('added-here') is False
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == ['safetyblur', 'added-elsewhere', 'added-here']
+
+
+def _add_many(path, worker):
+    catalog = ProductCatalog(path)
+    for n in range(15):
+        catalog.add(f"p{worker}_{n}")
+
+
+def test_concurrent_adds_do_not_lose_products(tmp_path):
+    path = str(tmp_path / 'products.json')
+    workers = [multiprocessing.Process(target=_add_many, args=(path, w)) for w in range(4)]
+    for proc in workers:
+        proc.start()
+    for proc in workers:
+        proc.join()
+    assert len(ProductCatalog(path).names()) == 60
+
+
+def test_atomic_write_preserves_mode(tmp_path):
+    path = str(tmp_path / 'products.json')
+    write_json(path, [])
+    os.chmod(path, 0o644)
+    atomic_write_json(path, ['safetyblur'])
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('.products.json.')]
+
+
+def test_atomic_write_new_file_uses_umask(tmp_path):
+    path = str(tmp_path / 'new.json')
+    old = os.umask(0o022)
+    try:
+        atomic_write_json(path, {})
+    finally:
+        os.umask(old)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+
+
+def test_locked_update_rereads_file(tmp_path):
+    path = str(tmp_path / 'config.json')
+    write_json(path, {'table': {'name': 'licences'}, 'license': {'key_length': 32}})
+    locked_update_json(path, lambda data: data.setdefault('product', {}).update(name='safetyblur'))
+
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == {
+            'table': {'name': 'licences'},
+            'license': {'key_length': 32},
+            'product': {'name': 'safetyblur'},
+        }